@@ -99,7 +99,7 @@ class Erob(Actuator):
     ) -> float | None:
         # Target velocity is assumed to be 0
         amps = position_error * self.kp + self.damping * np.sqrt(self.kp) * (0.0 - dq)
-        amps = np.clip(amps, -self.max_amps, self.max_amps)
+        amps = min(max(amps, -self.max_amps), self.max_amps)
 
         return amps
 
@@ -117,7 +117,7 @@ class Erob(Actuator):
 
         min_torque = -volts_bounded_torque - emf
         max_torque = volts_bounded_torque - emf
-        torque = np.clip(torque, min_torque, max_torque)
+        torque = min(max(torque, min_torque), max_torque)
 
         return torque
 
@@ -172,7 +172,7 @@ class MXActuator(Actuator):
         self, position_error: float, q: float, dq: float
     ) -> float | None:
         duty_cycle = position_error * self.kp * self.error_gain
-        duty_cycle = np.clip(duty_cycle, -self.max_pwm, self.max_pwm)
+        duty_cycle = min(max(duty_cycle, -self.max_pwm), self.max_pwm)
 
         return self.vin * duty_cycle
 
@@ -232,7 +232,7 @@ class LinearActuator(Actuator):
         self, position_error: float, q: float, dq: float
     ) -> float | None:
         duty_cycle = position_error * self.kp
-        duty_cycle = np.clip(duty_cycle, -1.0, 1.0)
+        duty_cycle = min(max(duty_cycle, -1.0), 1.0)
 
         return self.vin * duty_cycle
 
@@ -18,15 +18,17 @@ for velocity in range(10):
     for motor_torque in torques:
         external_torque_low = None
         external_torque_high = None
-        for external_torque in torques:
-            frictions, _ = model.compute_frictions(motor_torque, -external_torque, velocity)
+        frictions, _ = model.compute_frictions_batch(motor_torque, -torques, velocity)
 
-            if motor_torque - frictions > external_torque:
-                if external_torque_low is None or external_torque > external_torque_low:
-                    external_torque_low = external_torque
+        # Largest external torque that can be driven
+        driven = torques[motor_torque - frictions > torques]
+        if len(driven):
+            external_torque_low = driven.max()
 
-            if external_torque_high is None and motor_torque + frictions < external_torque:
-                external_torque_high = external_torque
+        # Smallest external torque that backdrives the motor
+        backdriven = torques[motor_torque + frictions < torques]
+        if len(backdriven):
+            external_torque_high = backdriven[0]
 
         lows.append(external_torque_low)
         highs.append(external_torque_high)
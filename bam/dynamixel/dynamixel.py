@@ -1,5 +1,6 @@
 import os
-import numpy as np
+import math
+import time
 from dynamixel_sdk import *
 
 # Torque enable
@@ -19,6 +20,11 @@ ADDR_PRESENT_VOLTAGE = 42
 # Present temperature (1 byte)
 ADDR_PRESENT_TEMPERATURE = 43
 
+# Position (12-bit value) steps per radian
+POSITION_STEPS_PER_RAD = 4096 / (2 * math.pi)
+# Speed unit (0.11 rpm per step) in rad/s
+SPEED_STEP_RAD_S = 0.11 * 2 * math.pi / 60.0
+
 
 class DynamixelActuatorV1:
     def __init__(self, port: str, id: int = 1):
@@ -34,6 +40,13 @@ class DynamixelActuatorV1:
         self.portHandler.openPort()
         self.portHandler.setBaudRate(1000000)
 
+        # Last successfully read data (returned again, flagged stale, when a read fails)
+        self.last_data: dict | None = None
+
+        # Number of failed reads, and time of the last message about them
+        self.failed_reads: int = 0
+        self.failed_reads_message_t: float = 0.0
+
     def set_p_gain(self, gain: int):
         # Set P gain
         self.packetHandler.write2ByteTxOnly(
@@ -48,7 +61,7 @@ class DynamixelActuatorV1:
 
     def set_goal_position(self, position: float):
         # Position is a 12-bit value
-        position = int(4096 * (position / (2 * np.pi) + 0.5))
+        position = int(position * POSITION_STEPS_PER_RAD + 2048)
 
         # Set goal position
         self.packetHandler.write2ByteTxOnly(
@@ -61,15 +74,33 @@ class DynamixelActuatorV1:
             self.portHandler, self.id, ADDR_PRESENT_POSITION, 8
         )
 
+        # A failed read is not retried (to bound the latency of the control loop),
+        # the last good data is returned instead, with "stale" set
+        if result != COMM_SUCCESS:
+            message = self.packetHandler.getTxRxResult(result)
+            if self.last_data is None:
+                raise Exception(f"Failed to read data from servo {self.id}: {message}")
+
+            # Reporting failures at most once per second
+            self.failed_reads += 1
+            if time.time() - self.failed_reads_message_t > 1.0:
+                self.failed_reads_message_t = time.time()
+                print(
+                    f"Failed to read data from servo {self.id} ({message}), "
+                    f"{self.failed_reads} failed reads so far"
+                )
+
+            return {**self.last_data, "stale": True}
+
         # Position is a 12-bit value
         position = (data[1] << 8) | data[0]
-        position = 2 * np.pi * ((position / 4096) - 0.5)
+        position = (position - 2048) / POSITION_STEPS_PER_RAD
 
         # Speed is a 10-bit value, units are 0.11 rpm per step
         speed = (data[3] << 8) | data[2]
         if speed > 1024:
             speed = -(speed - 1024)
-        speed = speed * 0.11 * 2 * np.pi / 60.0
+        speed = speed * SPEED_STEP_RAD_S
 
         # Applied "load"
         load = (data[5] << 8) | data[4]
@@ -82,10 +113,12 @@ class DynamixelActuatorV1:
         # Temperature are °C
         temp = data[7]
 
-        return {
+        self.last_data = {
             "position": position,
             "speed": speed,
             "load": load,
             "input_volts": volts,
             "temp": temp,
         }
+
+        return {**self.last_data, "stale": False}
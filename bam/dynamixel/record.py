@@ -58,6 +58,10 @@ while time.time() - start < trajectory.duration:
     entry = dxl.read_data()
     t1 = time.time() - start
 
+    # Failed reads return the previous data again, they are not logged
+    if entry.pop("stale"):
+        continue
+
     entry["timestamp"] = (t0 + t1) / 2.0
     entry["goal_position"] = goal_position
     entry["torque_enable"] = torque_enable
@@ -62,6 +62,11 @@ while (time.time() - start) * args.speed < trajectory.init_duration + trajectory
         entry = {"r1": dxl_1.read_data(), "r2": dxl_2.read_data()}
         t1 = time.time() - start
 
+        # Failed reads return the previous data again, they are not logged
+        stale_1, stale_2 = entry["r1"].pop("stale"), entry["r2"].pop("stale")
+        if stale_1 or stale_2:
+            continue
+
         entry["timestamp"] = (t0 + t1) / 2.0
         entry["r1"]["goal_position"] = goal_1
         entry["r2"]["goal_position"] = goal_2
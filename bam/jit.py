@@ -0,0 +1,19 @@
+import numpy as np
+
+try:
+    from numba import njit, vectorize
+except ImportError:
+
+    def njit(*args, **kwargs):
+        """
+        Fallback when numba is not installed: functions are left as plain Python
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+    def vectorize(*args, **kwargs):
+        """
+        Fallback when numba is not installed: numpy's (slow) vectorize
+        """
+        return np.vectorize
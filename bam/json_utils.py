@@ -0,0 +1,23 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def load_json(filename: str):
+    """
+    Loads a JSON file, using orjson (faster) when it is installed
+    """
+    with open(filename, "rb") as f:
+        content = f.read()
+
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN / Infinity values that json.dump writes
+            pass
+
+    return json.loads(content)
@@ -1,23 +1,32 @@
 import glob
 import copy
 import random
-import json
+import numpy as np
+from .json_utils import load_json
 
 
 class Logs:
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, dtype=np.float64):
         # Directories
         self.directory: str = directory
         self.json_files = glob.glob(f"{self.directory}/*.json")
 
         self.logs = []
         for json_file in self.json_files:
-            with open(json_file) as f:
-                data = json.load(f)
-                data["filename"] = json_file
-                if "arm_mass" not in data:
-                    data["arm_mass"] = 0.0
-                self.logs.append(data)
+            data = load_json(json_file)
+            data["filename"] = json_file
+            if "arm_mass" not in data:
+                data["arm_mass"] = 0.0
+
+            # Measured positions as a contiguous array, used when scoring (dtype
+            # can be np.float32 to halve the memory traffic)
+            data["positions_arr"] = np.asarray(
+                [entry["position"] for entry in data["entries"]], dtype=dtype
+            )
+            # Simulated positions and scratch buffers, reused when computing scores
+            data["_positions_out"] = np.empty_like(data["positions_arr"])
+            data["_scratch"] = np.empty_like(data["positions_arr"])
+            self.logs.append(data)
 
     def split(self, selector_kp: int) -> "Logs":
         """
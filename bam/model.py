@@ -1,7 +1,217 @@
+import math
 import numpy as np
-import json
 from .actuator import Actuator, actuators
 from .parameter import Parameter
+from .jit import njit, vectorize
+from .json_utils import load_json
+
+# Model variant flags, combined as a bitmask
+LOAD_DEPENDENT = 1
+DIRECTIONAL = 2
+STRIBECK = 4
+QUADRATIC = 8
+
+
+# Friction parameters, in the order expected by the friction kernels, with the
+# value used when the model variant doesn't have them
+FRICTION_PARAMETERS = [
+    ("friction_base", 0.0),
+    ("friction_viscous", 0.0),
+    ("friction_stribeck", 0.0),
+    ("load_friction_base", 0.0),
+    ("load_friction_stribeck", 0.0),
+    ("load_friction_motor", 0.0),
+    ("load_friction_external", 0.0),
+    ("load_friction_motor_stribeck", 0.0),
+    ("load_friction_external_stribeck", 0.0),
+    ("load_friction_motor_quad", 0.0),
+    ("load_friction_external_quad", 0.0),
+    ("dtheta_stribeck", 1.0),
+    ("alpha", 1.0),
+]
+
+
+# Compiled friction kernels and ufuncs, one per model variant (keyed by flags)
+_frictions_kernels = {}
+_frictions_ufuncs = {}
+
+
+def _make_frictions_kernel(flags: int):
+    """
+    Builds the friction kernel specialized for the model variant described by
+    flags. The variant booleans are closure constants, so numba compiles only the
+    active terms.
+    """
+    load_dependent = (flags & LOAD_DEPENDENT) != 0
+    directional = (flags & DIRECTIONAL) != 0
+    stribeck = (flags & STRIBECK) != 0
+    quadratic = (flags & QUADRATIC) != 0
+
+    @njit(cache=True, fastmath=True)
+    def frictions_kernel(
+        motor_torque,
+        external_torque,
+        dtheta,
+        friction_base,
+        friction_viscous,
+        friction_stribeck,
+        load_friction_base,
+        load_friction_stribeck,
+        load_friction_motor,
+        load_friction_external,
+        load_friction_motor_stribeck,
+        load_friction_external_stribeck,
+        load_friction_motor_quad,
+        load_friction_external_quad,
+        dtheta_stribeck,
+        alpha,
+    ):
+        # Torque applied to the gearbox
+        gearbox_torque_stribeck = 0.0
+        if directional:
+            gearbox_torque = abs(
+                external_torque * load_friction_external
+                - motor_torque * load_friction_motor
+            )
+            if stribeck:
+                gearbox_torque_stribeck = abs(
+                    external_torque * load_friction_external_stribeck
+                    - motor_torque * load_friction_motor_stribeck
+                )
+        else:
+            gearbox_torque = abs(external_torque - motor_torque)
+
+        # Stribeck coeff (1 when stopped to 0 when moving)
+        stribeck_coeff = 0.0
+        if stribeck:
+            stribeck_coeff = math.exp(
+                -math.pow(math.fabs(dtheta / dtheta_stribeck), alpha)
+            )
+
+        # Static friction
+        frictionloss = friction_base
+        if load_dependent:
+            if directional:
+                frictionloss += gearbox_torque
+            else:
+                frictionloss += load_friction_base * gearbox_torque
+
+        if stribeck:
+            frictionloss += stribeck_coeff * friction_stribeck
+
+            if load_dependent:
+                if directional:
+                    frictionloss += gearbox_torque_stribeck * stribeck_coeff
+                else:
+                    frictionloss += (
+                        load_friction_stribeck * gearbox_torque * stribeck_coeff
+                    )
+
+                if quadratic and np.sign(external_torque) != np.sign(motor_torque):
+                    if abs(external_torque) < abs(motor_torque):
+                        gearbox_torque2 = (
+                            load_friction_external_quad * abs(external_torque) ** 2
+                        )
+                    else:
+                        gearbox_torque2 = (
+                            load_friction_motor_quad * abs(motor_torque) ** 2
+                        )
+
+                    frictionloss += gearbox_torque2 * stribeck_coeff
+
+        # Viscous friction
+        damping = friction_viscous
+
+        return frictionloss, damping
+
+    @njit(cache=True, fastmath=True)
+    def frictions_kernel_array(motor_torque, external_torque, dtheta, parameters):
+        # Same, taking the parameter values as an array (ordered as
+        # FRICTION_PARAMETERS), which is much cheaper to pass from Python
+        return frictions_kernel(
+            motor_torque,
+            external_torque,
+            dtheta,
+            parameters[0],
+            parameters[1],
+            parameters[2],
+            parameters[3],
+            parameters[4],
+            parameters[5],
+            parameters[6],
+            parameters[7],
+            parameters[8],
+            parameters[9],
+            parameters[10],
+            parameters[11],
+            parameters[12],
+        )
+
+    return frictions_kernel, frictions_kernel_array
+
+
+def get_frictions_kernel(flags: int, array: bool = True):
+    """
+    Returns the (cached) friction kernel for the given model variant flags. If
+    array is True, the kernel takes the parameter values as an array, else as
+    separate scalar arguments
+    """
+    if flags not in _frictions_kernels:
+        _frictions_kernels[flags] = _make_frictions_kernel(flags)
+
+    return _frictions_kernels[flags][1 if array else 0]
+
+
+def get_frictions_ufunc(flags: int):
+    """
+    Returns the (cached) ufunc computing the frictionloss for the given model
+    variant flags, broadcasting over torques and velocities
+    """
+    if flags not in _frictions_ufuncs:
+        frictions_kernel = get_frictions_kernel(flags, array=False)
+        signature = "float64(" + ", ".join(["float64"] * 16) + ")"
+
+        @vectorize([signature], cache=True)
+        def frictionloss_ufunc(
+            motor_torque,
+            external_torque,
+            dtheta,
+            friction_base,
+            friction_viscous,
+            friction_stribeck,
+            load_friction_base,
+            load_friction_stribeck,
+            load_friction_motor,
+            load_friction_external,
+            load_friction_motor_stribeck,
+            load_friction_external_stribeck,
+            load_friction_motor_quad,
+            load_friction_external_quad,
+            dtheta_stribeck,
+            alpha,
+        ):
+            return frictions_kernel(
+                motor_torque,
+                external_torque,
+                dtheta,
+                friction_base,
+                friction_viscous,
+                friction_stribeck,
+                load_friction_base,
+                load_friction_stribeck,
+                load_friction_motor,
+                load_friction_external,
+                load_friction_motor_stribeck,
+                load_friction_external_stribeck,
+                load_friction_motor_quad,
+                load_friction_external_quad,
+                dtheta_stribeck,
+                alpha,
+            )[0]
+
+        _frictions_ufuncs[flags] = frictionloss_ufunc
+
+    return _frictions_ufuncs[flags]
 
 
 class Model:
@@ -24,6 +234,21 @@ class Model:
         self.stribeck: bool = stribeck
         self.quadratic: bool = quadratic
 
+        # Parameters caches, filled once the actuator is set
+        self._parameters: dict | None = None
+        self._optimized_parameters: list | None = None
+
+        self._flags: int = 0
+        if load_dependent:
+            self._flags |= LOAD_DEPENDENT
+        if directional:
+            self._flags |= DIRECTIONAL
+        if stribeck:
+            self._flags |= STRIBECK
+        if quadratic:
+            self._flags |= QUADRATIC
+        self._frictions_kernel = get_frictions_kernel(self._flags)
+
         self.max_friction_base = 0.2
         self.max_load_friction = 0.5
         self.max_viscous_friction = 1.0
@@ -72,101 +297,104 @@ class Model:
         # Viscous friction [Nm/(rad/s)]
         self.friction_viscous = Parameter(0.1, 0.0, self.max_viscous_friction)
 
+        # Parameters passed to the frictions kernel (constants for missing ones)
+        self._friction_parameters = [
+            getattr(self, name, None) or Parameter(default, default, default, False)
+            for name, default in FRICTION_PARAMETERS
+        ]
+
+        self._parameters = None
+        self._optimized_parameters = None
+        self._parameters = self.get_parameters()
+
+        # Friction parameter values array, rebuilt when a parameter value changes
+        self._friction_values = None
+        self._friction_values_version = -1
+
     def compute_frictions(
         self, motor_torque: float, external_torque: float, dtheta: float
     ) -> tuple:
-        # Torque applied to the gearbox
-        if self.directional:
-            gearbox_torque = np.abs(
-                external_torque * self.load_friction_external.value
-                - motor_torque * self.load_friction_motor.value
-            )
-            if self.stribeck:
-                gearbox_torque_stribeck = np.abs(
-                    external_torque * self.load_friction_external_stribeck.value
-                    - motor_torque * self.load_friction_motor_stribeck.value
-                )
-        else:
-            gearbox_torque = np.abs(external_torque - motor_torque)
+        return self._frictions_kernel(
+            motor_torque, external_torque, dtheta, self.get_friction_values()
+        )
 
-        if self.stribeck:
-            # Stribeck coeff (1 when stopped to 0 when moving)
-            stribeck_coeff = np.exp(
-                -(np.abs(dtheta / self.dtheta_stribeck.value) ** self.alpha.value)
+    def get_friction_values(self) -> np.ndarray:
+        """
+        Values of the friction parameters, as expected by the friction kernels
+        """
+        if self._friction_values_version != Parameter.version:
+            self._friction_values = np.array(
+                [parameter.value for parameter in self._friction_parameters],
+                dtype=np.float64,
             )
+            self._friction_values_version = Parameter.version
 
-        # Static friction
-        frictionloss = self.friction_base.value
-        if self.load_dependent:
-            if self.directional:
-                frictionloss += gearbox_torque
-            else:
-                frictionloss += self.load_friction_base.value * gearbox_torque
-
-        if self.stribeck:
-            frictionloss += stribeck_coeff * self.friction_stribeck.value
-
-            if self.load_dependent:
-                if self.directional:
-                    frictionloss += gearbox_torque_stribeck * stribeck_coeff
-                else:
-                    frictionloss += (
-                        self.load_friction_stribeck.value
-                        * gearbox_torque
-                        * stribeck_coeff
-                    )
-
-                if self.quadratic and np.sign(external_torque) != np.sign(motor_torque):
-                    if abs(external_torque) < abs(motor_torque):
-                        gearbox_torque2 = (
-                            self.load_friction_external_quad.value
-                            * abs(external_torque) ** 2
-                        )
-                    else:
-                        gearbox_torque2 = (
-                            self.load_friction_motor_quad.value * abs(motor_torque) ** 2
-                        )
-
-                    frictionloss += gearbox_torque2 * stribeck_coeff
+        return self._friction_values
 
-        # Viscous friction
-        damping = self.friction_viscous.value
+    def compute_frictions_batch(self, motor_torque, external_torque, dtheta) -> tuple:
+        """
+        Same as compute_frictions, but broadcasting over arrays of torques and
+        velocities. Returns (frictionloss array, damping)
+        """
+        frictionloss = get_frictions_ufunc(self._flags)(
+            motor_torque,
+            external_torque,
+            dtheta,
+            *self.get_friction_values(),
+        )
 
-        return frictionloss, damping
+        return frictionloss, self.friction_viscous.value
 
     def get_parameters(self) -> dict:
         """
         This returns the list of parameters that can be optimized.
         """
+        if self._parameters is not None:
+            return self._parameters
+
         return {
             name: param
             for name, param in vars(self).items()
             if isinstance(param, Parameter)
         }
 
+    def get_optimized_parameters(self) -> list:
+        """
+        Returns the (name, parameter) pairs that are optimized. The list is cached
+        on first call, optimize flags should not be changed afterwards.
+        """
+        if self._optimized_parameters is None:
+            self._optimized_parameters = [
+                (name, parameter)
+                for name, parameter in self.get_parameters().items()
+                if parameter.optimize
+            ]
+
+        return self._optimized_parameters
+
     def get_parameter_values(self) -> dict:
         """
         Return a dict containing parameter values
         """
-        parameters = self.get_parameters()
-        x = {}
-        for name in parameters:
-            parameter = parameters[name]
-            if parameter.optimize:
-                x[name] = parameter.value
-        return x
+        return {
+            name: parameter.value for name, parameter in self.get_optimized_parameters()
+        }
 
     def load_parameters(self, json_file: str) -> list:
         """
         Load parameters from a given filename
         """
-        with open(json_file) as f:
-            data = json.load(f)
-            parameters = self.get_parameters()
+        self.set_parameters(load_json(json_file))
+
+    def set_parameters(self, data: dict) -> None:
+        """
+        Set parameter values from a dict (e.g. loaded from a parameters file)
+        """
+        parameters = self.get_parameters()
 
-            for name in parameters:
-                if name in data:
-                    parameters[name].value = data[name]
+        for name in parameters:
+            if name in data:
+                parameters[name].value = data[name]
 
 
 class DummyModel(Model):
@@ -203,10 +431,9 @@ models = {
 
 
 def load_model(json_file: str):
-    with open(json_file) as f:
-        data = json.load(f)
-        model = models[data["model"]]()
-        model.set_actuator(actuators[data["actuator"]]())
-        model.actuator_name = data["actuator"]
-        model.load_parameters(json_file)
-        return model
+    data = load_json(json_file)
+    model = models[data["model"]]()
+    model.set_actuator(actuators[data["actuator"]]())
+    model.actuator_name = data["actuator"]
+    model.set_parameters(data)
+    return model
@@ -1,5 +1,8 @@
-
 class Parameter:
+    # Incremented whenever a parameter value is changed, so that values computed from
+    # parameters can be cached
+    version: int = 0
+
     def __init__(self, value: float, min: float, max: float, optimize: bool = True):
         # Current value of the parameter
         self.value: float = value
@@ -9,4 +12,13 @@ class Parameter:
         self.max: float = max
 
         # Should this parameter be optimized?
-        self.optimize: bool = optimize
\ No newline at end of file
+        self.optimize: bool = optimize
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @value.setter
+    def value(self, value: float):
+        self._value = value
+        Parameter.version += 1
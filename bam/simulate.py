@@ -1,5 +1,30 @@
+import math
 import numpy as np
 from .model import Model
+from .jit import njit
+
+
+@njit(cache=True)
+def _integrate(q, dq, motor_torque, bias_torque, frictionloss, damping, inertia, dt):
+    """
+    Applies the frictions and integrates the state for dt, returns the new (q, dq)
+    """
+    net_torque = motor_torque + bias_torque
+
+    # Tau_stop is the torque required to stop the motor (reach a velocity of 0 after dt)
+    tau_stop = (inertia / dt) * dq + net_torque
+    static_friction = -math.copysign(
+        min(abs(tau_stop), frictionloss + damping * abs(dq)), tau_stop
+    )
+    net_torque += static_friction
+
+    angular_acceleration = net_torque / inertia
+
+    dq += angular_acceleration * dt
+    dq = min(max(dq, -100.0), 100.0)
+    q += dq * dt + 0.5 * angular_acceleration * dt**2
+
+    return q, dq
 
 
 class Simulator:
@@ -32,30 +57,33 @@ class Simulator:
             self.model.actuator.testbench.compute_mass(self.q, self.dq)
             + self.model.actuator.get_extra_inertia()
         )
-        net_torque = motor_torque + bias_torque
 
-        # Tau_stop is the torque required to stop the motor (reach a velocity of 0 after dt)
-        tau_stop = (inertia / dt) * self.dq + net_torque
-        static_friction = -np.sign(tau_stop) * np.min(
-            [np.abs(tau_stop), frictionloss + damping * np.abs(self.dq)]
+        self.q, self.dq = _integrate(
+            self.q,
+            self.dq,
+            motor_torque,
+            bias_torque,
+            frictionloss,
+            damping,
+            inertia,
+            dt,
         )
-        net_torque += static_friction
-
-        angular_acceleration = net_torque / inertia
-
-        self.dq += angular_acceleration * dt
-        self.dq = np.clip(self.dq, -100.0, 100.0)
-        self.q += self.dq * dt + 0.5 * angular_acceleration * dt**2
         self.t += dt
 
     def rollout_log(
-        self, log: dict, reset_period: float = None, simulate_control: bool = False
+        self,
+        log: dict,
+        reset_period: float = None,
+        simulate_control: bool = False,
+        out: np.ndarray = None,
     ):
         """
         Read a given log dict and return the sequential reached positions
+
+        If out is given, the positions are written in this (preallocated) array
         """
-        positions = []
-        velocities = []
+        positions = np.empty(len(log["entries"])) if out is None else out
+        velocities = np.empty(len(log["entries"]))
         all_controls = []
 
         reset_period_t = 0.0
@@ -64,13 +92,13 @@ class Simulator:
         self.reset(first_entry["position"], first_entry["speed"] if "speed" in first_entry else 0.0)
         self.model.actuator.load_log(log)
 
-        for entry in log["entries"]:
+        for k, entry in enumerate(log["entries"]):
             reset_period_t += dt
             if reset_period is not None and reset_period_t > reset_period:
                 reset_period_t = 0.0
                 self.reset(entry["position"], entry["speed"])
-            positions.append(self.q)
-            velocities.append(self.dq)
+            positions[k] = self.q
+            velocities[k] = self.dq
 
             if entry["torque_enable"]:
                 if simulate_control:
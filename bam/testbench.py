@@ -1,4 +1,4 @@
-import numpy as np
+import math
 
 
 class Testbench:
@@ -34,17 +34,20 @@ class Pendulum:
         self.arm_mass = log["arm_mass"]
         self.length = log["length"]
 
+        # The inertia and the gravity torque gain are constant for a given log, they
+        # are computed once here rather than at each simulation step
+        self.inertia = self.mass * self.length**2
+        self.inertia += (self.arm_mass / 3) * self.length**2
+
+        g = -9.80665
+        self.gravity_gain = (self.mass + self.arm_mass / 2) * g * self.length
+
     def compute_mass(self, q: float, dq: float) -> float:
         """
         In the case of a pendulum, the mass is an inertia
         """
-        inertia = self.mass * self.length**2
-        inertia += (self.arm_mass / 3) * self.length**2
-
-        return inertia
+        return self.inertia
 
     def compute_bias(self, q: float, dq: float) -> float:
-        g = -9.80665
-
-        return (self.mass + self.arm_mass / 2) * g * self.length * np.sin(q)
+        return self.gravity_gain * math.sin(q)
     
\ No newline at end of file